@@ -1,14 +1,22 @@
-"""JSON 캐시 + SHA256 해시 변경 감지"""
+"""JSON(zstd 압축) 캐시 + SHA256 해시/ETag 저장
 
-import hashlib
-import json
+파일 I/O와 (역)직렬화는 이벤트 루프를 막지 않도록 `asyncio.to_thread`로
+실행한다. 공개 함수는 async, 실제 작업은 `_*_sync` 함수가 담당한다.
+"""
+
+import asyncio
 import logging
 from pathlib import Path
 
+import orjson
+import zstandard as zstd
+
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path.home() / ".toss-mcp-cache"
-CHUNKS_FILE = CACHE_DIR / "chunks.json"
+CHUNKS_FILE = CACHE_DIR / "chunks.json.zst"
+LEGACY_CHUNKS_FILE = CACHE_DIR / "chunks.json"  # 압축 도입 이전 포맷
+CHUNKS_ZSTD_LEVEL = 3
 HASHES_FILE = CACHE_DIR / "hashes.json"
 ETAGS_FILE = CACHE_DIR / "etags.json"
 
@@ -17,74 +25,69 @@ def _ensure_dir():
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def compute_hash(text: str) -> str:
-    """텍스트의 SHA256 해시를 계산한다."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
-
-def load_hashes() -> dict[str, str]:
-    """저장된 해시를 로드한다."""
+def _save_hashes_sync(hashes: dict[str, str]):
     _ensure_dir()
-    if HASHES_FILE.exists():
-        return json.loads(HASHES_FILE.read_text("utf-8"))
-    return {}
+    HASHES_FILE.write_bytes(orjson.dumps(hashes))
 
 
-def save_hashes(hashes: dict[str, str]):
-    """해시를 저장한다."""
-    _ensure_dir()
-    HASHES_FILE.write_text(json.dumps(hashes, ensure_ascii=False), "utf-8")
-
-
-def load_chunks() -> list[dict] | None:
-    """캐시된 청크를 로드한다. 없으면 None."""
+def _load_chunks_sync() -> list[dict] | None:
     _ensure_dir()
     if CHUNKS_FILE.exists():
-        data = json.loads(CHUNKS_FILE.read_text("utf-8"))
+        raw = zstd.ZstdDecompressor().decompress(CHUNKS_FILE.read_bytes())
+        data = orjson.loads(raw)
         logger.info("캐시 로드: %d개 청크", len(data))
         return data
+    if LEGACY_CHUNKS_FILE.exists():
+        data = orjson.loads(LEGACY_CHUNKS_FILE.read_bytes())
+        logger.info("이전 포맷 캐시 로드: %d개 청크 (zstd 포맷으로 변환)", len(data))
+        _save_chunks_sync(data)
+        LEGACY_CHUNKS_FILE.unlink(missing_ok=True)
+        return data
     return None
 
 
-def save_chunks(chunks: list[dict]):
-    """청크를 캐시에 저장한다."""
+def _save_chunks_sync(chunks: list[dict]):
     _ensure_dir()
-    CHUNKS_FILE.write_text(
-        json.dumps(chunks, ensure_ascii=False, indent=None), "utf-8"
-    )
+    cctx = zstd.ZstdCompressor(level=CHUNKS_ZSTD_LEVEL, threads=-1)
+    CHUNKS_FILE.write_bytes(cctx.compress(orjson.dumps(chunks)))
     logger.info("캐시 저장: %d개 청크", len(chunks))
 
 
-def needs_refresh(current_raw_texts: dict[str, str]) -> bool:
-    """현재 원본 텍스트 해시와 저장된 해시를 비교하여 갱신 필요 여부를 반환한다."""
-    saved = load_hashes()
-    for key, text in current_raw_texts.items():
-        current_hash = compute_hash(text)
-        if saved.get(key) != current_hash:
-            logger.info("해시 불일치: %s → 재수집 필요", key)
-            return True
-    # 캐시 파일이 없는 경우도 갱신 필요
-    if not CHUNKS_FILE.exists():
-        return True
-    logger.info("해시 일치: 캐시 사용")
-    return False
+def _load_etags_sync() -> dict[str, str]:
+    _ensure_dir()
+    if ETAGS_FILE.exists():
+        return orjson.loads(ETAGS_FILE.read_bytes())
+    return {}
+
+
+def _save_etags_sync(etags: dict[str, str]):
+    _ensure_dir()
+    ETAGS_FILE.write_bytes(orjson.dumps(etags))
+
+
+async def save_hashes(hashes: dict[str, str]):
+    """해시를 저장한다."""
+    await asyncio.to_thread(_save_hashes_sync, hashes)
+
 
+async def load_chunks() -> list[dict] | None:
+    """캐시된 청크를 로드한다. 없으면 None.
 
-def update_hashes(raw_texts: dict[str, str]):
-    """현재 원본 텍스트의 해시를 저장한다."""
-    hashes = {key: compute_hash(text) for key, text in raw_texts.items()}
-    save_hashes(hashes)
+    이전 포맷(chunks.json)만 있으면 읽은 뒤 압축 포맷으로 한 번 옮겨 둔다.
+    """
+    return await asyncio.to_thread(_load_chunks_sync)
 
 
-def load_etags() -> dict[str, str]:
+async def save_chunks(chunks: list[dict]):
+    """청크를 zstd로 압축해 캐시에 저장한다."""
+    await asyncio.to_thread(_save_chunks_sync, chunks)
+
+
+async def load_etags() -> dict[str, str]:
     """저장된 ETag를 로드한다."""
-    _ensure_dir()
-    if ETAGS_FILE.exists():
-        return json.loads(ETAGS_FILE.read_text("utf-8"))
-    return {}
+    return await asyncio.to_thread(_load_etags_sync)
 
 
-def save_etags(etags: dict[str, str]):
+async def save_etags(etags: dict[str, str]):
     """ETag를 저장한다."""
-    _ensure_dir()
-    ETAGS_FILE.write_text(json.dumps(etags, ensure_ascii=False), "utf-8")
+    await asyncio.to_thread(_save_etags_sync, etags)
@@ -1,17 +1,11 @@
 """마크다운 문서를 청크로 분리한다."""
 
-import re
 import logging
 
 logger = logging.getLogger(__name__)
 
 MAX_CHUNK_LEN = 3000
 
-# H1 ~ H3 분리용 패턴
-H1_PATTERN = re.compile(r"^# ", re.MULTILINE)
-H2_PATTERN = re.compile(r"^## ", re.MULTILINE)
-H3_PATTERN = re.compile(r"^### ", re.MULTILINE)
-
 
 def _extract_header(text: str) -> str:
     """청크 텍스트에서 첫 번째 헤더를 추출한다."""
@@ -22,9 +16,24 @@ def _extract_header(text: str) -> str:
     return ""
 
 
-def _split_by_pattern(text: str, pattern: re.Pattern) -> list[str]:
-    """정규식 패턴(헤더) 기준으로 텍스트를 분리한다."""
-    positions = [m.start() for m in pattern.finditer(text)]
+def _header_positions(text: str, level: int) -> list[int]:
+    """줄 맨 앞에 있는 레벨 `level` 헤더("## " 등)의 시작 위치를 반환한다.
+
+    정규식 없이 str.find로 문서를 한 번만 훑는다.
+    """
+    marker = "#" * level + " "
+    positions = [0] if text.startswith(marker) else []
+    line_marker = "\n" + marker
+    pos = text.find(line_marker)
+    while pos != -1:
+        positions.append(pos + 1)
+        pos = text.find(line_marker, pos + 1)
+    return positions
+
+
+def _split_by_level(text: str, level: int) -> list[str]:
+    """레벨 `level` 헤더 기준으로 텍스트를 분리한다."""
+    positions = _header_positions(text, level)
     if not positions:
         return [text]
 
@@ -45,53 +54,66 @@ def _split_by_pattern(text: str, pattern: re.Pattern) -> list[str]:
 
 
 def _split_chunk(text: str) -> list[str]:
-    """길이 초과 청크를 H2 → H3 순으로 추가 분할한다."""
-    if len(text) <= MAX_CHUNK_LEN:
-        return [text]
-
-    # H2로 분할 시도
-    parts = _split_by_pattern(text, H2_PATTERN)
-    if len(parts) > 1:
-        result = []
-        for p in parts:
-            result.extend(_split_chunk(p))
-        return result
+    """길이 초과 청크를 H2 → H3 순으로 추가 분할한다.
 
-    # H3로 분할 시도
-    parts = _split_by_pattern(text, H3_PATTERN)
-    if len(parts) > 1:
-        result = []
-        for p in parts:
-            result.extend(_split_chunk(p))
-        return result
+    재귀 대신 (텍스트, 시도할 헤더 레벨) 작업 스택으로 처리한다.
+    어떤 레벨로 나뉜 조각은 그 레벨 헤더를 맨 앞에 하나만 가지므로
+    다음 레벨부터 시도하고, 이미 짧은 조각은 스캔하지 않는다.
+    """
+    result = []
+    stack = [(text, 2)]
+    while stack:
+        part, start_level = stack.pop()
+        if len(part) <= MAX_CHUNK_LEN:
+            result.append(part)
+            continue
 
-    # 헤더 없이 길면 줄바꿈 기준 강제 분할
-    if len(text) > MAX_CHUNK_LEN:
-        return _force_split(text)
-    return [text]
+        for level in range(start_level, 4):
+            sub_parts = _split_by_level(part, level)
+            if len(sub_parts) > 1:
+                stack.extend((p, level + 1) for p in reversed(sub_parts))
+                break
+        else:
+            # 헤더 없이 길면 줄바꿈 기준 강제 분할
+            result.extend(_force_split(part))
+    return result
 
 
 def _force_split(text: str) -> list[str]:
     """헤더가 없는 긴 텍스트를 빈 줄 기준으로 강제 분할한다.
     빈 줄로도 분할이 안 되면 줄 단위로 분할한다."""
-    paragraphs = re.split(r"\n\n+", text)
+    # re.split(r"\n\n+")와 같은 결과: 3개 이상 연속된 줄바꿈의 나머지는 떼어내고
+    # 빈 문단은 버린다 (빈 문단은 결과에 영향이 없다).
+    first, *rest = text.split("\n\n")
+    paragraphs = [first] + [p.lstrip("\n") for p in rest]
+    paragraphs = [p for p in paragraphs if p]
+    # 문자열 += 대신 조각 리스트 + join으로 누적한다 (O(n²) 복사 방지)
     chunks = []
-    current = ""
+    current_parts: list[str] = []
+    current_len = 0
     for para in paragraphs:
         # 단일 문단이 MAX_CHUNK_LEN을 초과하면 줄 단위로 자른다
         if len(para) > MAX_CHUNK_LEN:
-            if current.strip():
-                chunks.append(current.strip())
-                current = ""
+            current = "\n\n".join(current_parts).strip()
+            if current:
+                chunks.append(current)
+                current_parts = []
+                current_len = 0
             chunks.extend(_split_by_lines(para))
             continue
-        if len(current) + len(para) + 2 > MAX_CHUNK_LEN and current:
-            chunks.append(current.strip())
-            current = para
+        if current_len + len(para) + 2 > MAX_CHUNK_LEN and current_len:
+            chunks.append("\n\n".join(current_parts).strip())
+            current_parts = [para]
+            current_len = len(para)
+        elif current_len:
+            current_parts.append(para)
+            current_len += len(para) + 2
         else:
-            current = current + "\n\n" + para if current else para
-    if current.strip():
-        chunks.append(current.strip())
+            current_parts = [para]
+            current_len = len(para)
+    current = "\n\n".join(current_parts).strip()
+    if current:
+        chunks.append(current)
     return chunks if chunks else [text]
 
 
@@ -99,15 +121,22 @@ def _split_by_lines(text: str) -> list[str]:
     """줄 단위로 MAX_CHUNK_LEN 이하로 분할한다."""
     lines = text.split("\n")
     chunks = []
-    current = ""
+    current_parts: list[str] = []
+    current_len = 0
     for line in lines:
-        if len(current) + len(line) + 1 > MAX_CHUNK_LEN and current:
-            chunks.append(current.strip())
-            current = line
+        if current_len + len(line) + 1 > MAX_CHUNK_LEN and current_len:
+            chunks.append("\n".join(current_parts).strip())
+            current_parts = [line]
+            current_len = len(line)
+        elif current_len:
+            current_parts.append(line)
+            current_len += len(line) + 1
         else:
-            current = current + "\n" + line if current else line
-    if current.strip():
-        chunks.append(current.strip())
+            current_parts = [line]
+            current_len = len(line)
+    current = "\n".join(current_parts).strip()
+    if current:
+        chunks.append(current)
     return chunks if chunks else [text]
 
 
@@ -122,7 +151,7 @@ def chunk_document(doc: dict) -> list[dict]:
     url = doc["url"]
 
     # 1차: H1 기준 분리
-    h1_parts = _split_by_pattern(content, H1_PATTERN)
+    h1_parts = _split_by_level(content, 1)
 
     chunks = []
     for part in h1_parts:
@@ -142,22 +171,11 @@ def chunk_document(doc: dict) -> list[dict]:
     return chunks
 
 
-def chunk_all(collected: dict) -> list[dict]:
-    """수집된 전체 문서를 청킹한다.
-
-    collected: {source_key: {raw_text, documents: [...]}}
-    반환: [{source, url, header, content}]
-    """
-    all_chunks = []
-    for source_key, data in collected.items():
-        for doc in data["documents"]:
-            chunks = chunk_document(doc)
-            all_chunks.extend(chunks)
-
+def log_chunk_stats(chunks: list[dict]):
+    """청킹 결과 통계(개수, 평균/최대 길이)를 로그로 남긴다."""
     logger.info(
         "청킹 완료: 총 %d개 청크, 평균 %.0f자, 최대 %d자",
-        len(all_chunks),
-        sum(len(c["content"]) for c in all_chunks) / max(len(all_chunks), 1),
-        max((len(c["content"]) for c in all_chunks), default=0),
+        len(chunks),
+        sum(len(c["content"]) for c in chunks) / max(len(chunks), 1),
+        max((len(c["content"]) for c in chunks), default=0),
     )
-    return all_chunks
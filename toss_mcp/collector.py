@@ -2,9 +2,12 @@
 
 import re
 import asyncio
+import hashlib
 import logging
 import httpx
 
+from .chunker import chunk_document, log_chunk_stats
+
 logger = logging.getLogger(__name__)
 
 SOURCES = {
@@ -27,98 +30,182 @@ SOURCES = {
 
 TIMEOUT = 30
 CONCURRENCY = 8
+CHUNK_WORKERS = 2  # 청킹은 GIL에 묶이므로 I/O와 겹치게 할 정도면 충분
+STREAM_CHUNK_SIZE = 65536
+
+# llms.txt 링크: [제목](URL)
+# 제목은 대괄호/줄바꿈, URL은 공백/괄호를 넘지 못하게 해 각 '['에서의 탐색이
+# 다음 구분자에서 끝나도록 한다 ('[' 반복 같은 입력에서 이차 시간 백트래킹 방지).
+LINK_PATTERN = re.compile(r"\[([^\[\]\n]+)\]\((https?://[^\s()]+)\)")
+
+# 모든 수집 경로가 공유하는 HTTP/2 클라이언트 (get_client / close_client)
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """공용 HTTP 클라이언트를 반환한다. 없거나 닫혀 있으면 새로 만든다.
+
+    같은 호스트로 가는 요청들이 HTTP/2 연결 하나를 다중화해 쓰므로
+    요청마다 TCP/TLS 핸드셰이크를 다시 하지 않는다.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=CONCURRENCY * 2,
+                max_keepalive_connections=CONCURRENCY * 2,
+            ),
+            timeout=TIMEOUT,
+        )
+    return _client
+
+
+async def close_client():
+    """공용 HTTP 클라이언트를 닫는다 (서버 종료 시 호출)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
-async def fetch_text(client: httpx.AsyncClient, url: str) -> str | None:
-    """URL에서 텍스트를 다운로드한다. 실패 시 None 반환."""
+async def fetch_text(client: httpx.AsyncClient, url: str) -> tuple[str, str] | None:
+    """URL에서 텍스트(UTF-8)를 다운로드한다. 실패 시 None 반환.
+
+    본문을 스트리밍으로 받으면서 원본 바이트의 SHA256을 함께 계산한다.
+    반환: (text, sha256 hexdigest)
+    """
     try:
-        resp = await client.get(url, timeout=TIMEOUT, follow_redirects=True)
-        resp.encoding = "utf-8"
-        resp.raise_for_status()
-        return resp.text
+        async with client.stream(
+            "GET", url, timeout=TIMEOUT, follow_redirects=True
+        ) as resp:
+            resp.raise_for_status()
+            digest = hashlib.sha256()
+            parts = []
+            async for data in resp.aiter_bytes(chunk_size=STREAM_CHUNK_SIZE):
+                digest.update(data)
+                parts.append(data)
     except Exception as e:
         logger.warning("fetch failed: %s → %s", url, e)
         return None
+    return b"".join(parts).decode("utf-8", errors="replace"), digest.hexdigest()
 
 
 def parse_links(llms_txt: str) -> list[dict[str, str]]:
     """llms.txt에서 [제목](URL) 형태의 링크를 파싱한다."""
-    pattern = re.compile(r"\[([^\]]+)\]\((https?://[^\)]+)\)")
-    results = []
-    for match in pattern.finditer(llms_txt):
-        title, url = match.group(1), match.group(2)
-        results.append({"title": title, "url": url})
-    return results
+    return [
+        {"title": m.group(1), "url": m.group(2)}
+        for m in LINK_PATTERN.finditer(llms_txt)
+    ]
 
 
 async def fetch_seed_pages(
-    client: httpx.AsyncClient, links: list[dict[str, str]]
-) -> list[dict]:
-    """앱인토스 하위 페이지들을 병렬로 수집한다."""
+    client: httpx.AsyncClient,
+    links: list[dict[str, str]],
+    queue: asyncio.Queue,
+    source_order: int,
+) -> int:
+    """앱인토스 하위 페이지들을 병렬로 수집해 완료되는 대로 청킹 큐에 넣는다.
+
+    큐 항목: ((source_order, link 순번), doc). 반환: 큐에 넣은 문서 수
+    """
     sem = asyncio.Semaphore(CONCURRENCY)
-    documents = []
+    count = 0
 
-    async def _fetch_one(link: dict[str, str]):
+    async def _fetch_one(i: int, link: dict[str, str]):
+        nonlocal count
         async with sem:
-            text = await fetch_text(client, link["url"])
-            if text:
-                documents.append(
+            fetched = await fetch_text(client, link["url"])
+        if fetched and fetched[0]:
+            count += 1
+            await queue.put(
+                (
+                    (source_order, i),
                     {
                         "source": "apps_in_toss",
                         "url": link["url"],
                         "title": link["title"],
-                        "content": text,
-                    }
+                        "content": fetched[0],
+                    },
                 )
+            )
 
-    await asyncio.gather(*[_fetch_one(link) for link in links])
-    return documents
+    await asyncio.gather(*[_fetch_one(i, link) for i, link in enumerate(links)])
+    return count
 
 
-async def collect_all() -> dict:
-    """모든 소스에서 문서를 수집한다. 반환: {source_key: {raw_text, documents}}"""
-    result = {}
-    async with httpx.AsyncClient() as client:
-        for key, source in SOURCES.items():
-            raw = await fetch_text(client, source["llms_url"])
-            if raw is None:
-                logger.error("소스 %s 수집 실패", key)
-                continue
+async def collect_and_chunk() -> tuple[list[dict], dict[str, str]]:
+    """모든 소스에서 문서를 수집하면서 바로 청킹한다.
 
-            if source["type"] == "full":
-                # 통합 마크다운: 그대로 전달
-                result[key] = {
-                    "raw_text": raw,
-                    "documents": [
-                        {
-                            "source": key,
-                            "url": source["llms_url"],
-                            "title": source["name"],
-                            "content": raw,
-                        }
-                    ],
-                }
-            else:
-                # seed: llms.txt 파싱 후 하위 페이지 순회
-                links = parse_links(raw)
-                logger.info("앱인토스 링크 %d개 발견", len(links))
-                documents = await fetch_seed_pages(client, links)
-                result[key] = {
-                    "raw_text": raw,
-                    "documents": documents,
-                }
+    다운로드가 끝난 문서는 큐를 거쳐 청킹 워커(스레드)로 곧장 넘어가므로
+    네트워크 대기와 청킹이 겹쳐 진행되고, 전체 문서 목록은 만들지 않는다.
+    청크 순서는 완료 순서와 무관하게 소스 순서 → 링크 순서로 고정된다.
+
+    반환: (chunks, raw_hashes)
+    - chunks: [{source, url, header, content}]
+    - raw_hashes: {source_key: 원본 llms.txt 바이트의 SHA256}
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CONCURRENCY * 2)
+    chunked: dict[tuple[int, int], list[dict]] = {}
+
+    async def _chunk_worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            order, doc = item
+            chunked[order] = await asyncio.to_thread(chunk_document, doc)
 
-    logger.info(
-        "수집 완료: %s",
-        {k: len(v["documents"]) for k, v in result.items()},
-    )
-    return result
+    raw_hashes: dict[str, str] = {}
+    doc_counts: dict[str, int] = {}
+    client = get_client()
 
+    try:
+        async with asyncio.TaskGroup() as tg:
+            workers = [tg.create_task(_chunk_worker()) for _ in range(CHUNK_WORKERS)]
+
+            for source_order, (key, source) in enumerate(SOURCES.items()):
+                fetched = await fetch_text(client, source["llms_url"])
+                if fetched is None:
+                    logger.error("소스 %s 수집 실패", key)
+                    continue
+                raw, raw_hash = fetched
+                raw_hashes[key] = raw_hash
 
-async def fetch_single_source_raw(url: str) -> str | None:
-    """단일 URL의 원본 텍스트를 반환한다 (해시 비교용)."""
-    async with httpx.AsyncClient() as client:
-        return await fetch_text(client, url)
+                if source["type"] == "full":
+                    # 통합 마크다운: 그대로 청킹
+                    await queue.put(
+                        (
+                            (source_order, 0),
+                            {
+                                "source": key,
+                                "url": source["llms_url"],
+                                "title": source["name"],
+                                "content": raw,
+                            },
+                        )
+                    )
+                    doc_counts[key] = 1
+                else:
+                    # seed: llms.txt 파싱 후 하위 페이지 순회
+                    links = parse_links(raw)
+                    logger.info("앱인토스 링크 %d개 발견", len(links))
+                    doc_counts[key] = await fetch_seed_pages(
+                        client, links, queue, source_order
+                    )
+
+            # 종료 신호: 워커마다 None 하나씩
+            for _ in workers:
+                await queue.put(None)
+    except BaseExceptionGroup as eg:
+        # TaskGroup이 감싼 예외를 풀어, 호출부에는 원래 예외를 그대로 전달한다
+        # (여러 개면 첫 번째)
+        raise eg.exceptions[0] from None
+
+    logger.info("수집 완료: %s", doc_counts)
+    chunks = [chunk for order in sorted(chunked) for chunk in chunked[order]]
+    log_chunk_stats(chunks)
+    return chunks, raw_hashes
 
 
 async def check_source_etags(
@@ -132,68 +219,68 @@ async def check_source_etags(
     new_etags: dict[str, str] = {}
     changed = False
 
-    async with httpx.AsyncClient() as client:
-        for key, source in SOURCES.items():
-            url = source["llms_url"]
-            stored_etag = stored_etags.get(key)
-            headers = {}
-            if stored_etag:
-                headers["If-None-Match"] = stored_etag
-
-            try:
-                resp = await client.get(
-                    url, headers=headers, timeout=TIMEOUT, follow_redirects=True
-                )
+    client = get_client()
+    for key, source in SOURCES.items():
+        url = source["llms_url"]
+        stored_etag = stored_etags.get(key)
+        headers = {}
+        if stored_etag:
+            headers["If-None-Match"] = stored_etag
 
-                if resp.status_code == 304:
-                    # 서버가 304 반환 → 변경 없음
-                    logger.info("ETag 304 (변경 없음): %s", key)
-                    new_etags[key] = stored_etag  # type: ignore[assignment]
-                    continue
+        try:
+            resp = await client.get(
+                url, headers=headers, timeout=TIMEOUT, follow_redirects=True
+            )
 
-                resp.raise_for_status()
-                etag = resp.headers.get("etag")
-                if etag:
-                    new_etags[key] = etag
-                    if stored_etag and etag == stored_etag:
-                        # 서버가 304를 지원하지 않지만 ETag 동일 → 변경 없음
-                        logger.info("ETag 일치 (변경 없음): %s", key)
-                    else:
-                        logger.info(
-                            "ETag 불일치 (변경 감지): %s [%s → %s]",
-                            key,
-                            stored_etag,
-                            etag,
-                        )
-                        changed = True
+            if resp.status_code == 304:
+                # 서버가 304 반환 → 변경 없음
+                logger.info("ETag 304 (변경 없음): %s", key)
+                new_etags[key] = stored_etag  # type: ignore[assignment]
+                continue
+
+            resp.raise_for_status()
+            etag = resp.headers.get("etag")
+            if etag:
+                new_etags[key] = etag
+                if stored_etag and etag == stored_etag:
+                    # 서버가 304를 지원하지 않지만 ETag 동일 → 변경 없음
+                    logger.info("ETag 일치 (변경 없음): %s", key)
                 else:
-                    # ETag 없음 → 판단 불가, 안전하게 갱신
-                    logger.info("ETag 없음 (갱신 필요): %s", key)
+                    logger.info(
+                        "ETag 불일치 (변경 감지): %s [%s → %s]",
+                        key,
+                        stored_etag,
+                        etag,
+                    )
                     changed = True
-
-            except Exception as e:
-                logger.warning("ETag 확인 실패: %s → %s", key, e)
+            else:
+                # ETag 없음 → 판단 불가, 안전하게 갱신
+                logger.info("ETag 없음 (갱신 필요): %s", key)
                 changed = True
 
+        except Exception as e:
+            logger.warning("ETag 확인 실패: %s → %s", key, e)
+            changed = True
+
     return new_etags, changed
 
 
 async def collect_etags() -> dict[str, str]:
     """모든 소스의 현재 ETag를 수집한다."""
     etags: dict[str, str] = {}
-    async with httpx.AsyncClient() as client:
-        for key, source in SOURCES.items():
-            try:
-                resp = await client.get(
-                    source["llms_url"], timeout=TIMEOUT, follow_redirects=True
-                )
-                resp.raise_for_status()
-                etag = resp.headers.get("etag")
-                if etag:
-                    etags[key] = etag
-                    logger.info("ETag 수집: %s → %s", key, etag)
-                else:
-                    logger.info("ETag 없음: %s", key)
-            except Exception as e:
-                logger.warning("ETag 수집 실패: %s → %s", key, e)
+    client = get_client()
+    for key, source in SOURCES.items():
+        try:
+            resp = await client.get(
+                source["llms_url"], timeout=TIMEOUT, follow_redirects=True
+            )
+            resp.raise_for_status()
+            etag = resp.headers.get("etag")
+            if etag:
+                etags[key] = etag
+                logger.info("ETag 수집: %s → %s", key, etag)
+            else:
+                logger.info("ETag 없음: %s", key)
+        except Exception as e:
+            logger.warning("ETag 수집 실패: %s → %s", key, e)
     return etags
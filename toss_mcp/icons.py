@@ -1,10 +1,15 @@
 """토스 아이콘 카탈로그 로드 및 검색."""
 
-import gzip
-import json
+import heapq
 import logging
+from collections import Counter
 from importlib import resources
 
+import orjson
+import zstandard as zstd
+
+from .searcher import build_text_index, lookup_keyword, split_keywords
+
 logger = logging.getLogger(__name__)
 
 MAX_ICON_RESULTS = 10
@@ -43,46 +48,47 @@ import { Asset } from '@toss/tds-react-native';
 """
 
 
-def _load_icon_payload_text() -> str | None:
-    """패키지 리소스에서 아이콘 JSON 텍스트를 로드한다.
+def _load_icon_payload_bytes() -> bytes | None:
+    """패키지 리소스에서 아이콘 JSON 바이트를 로드한다.
 
     우선순위:
-    1) toss_mcp/data/toss_icons.json.gz
+    1) toss_mcp/data/toss_icons.json.zst
     2) toss_mcp/data/toss_icons.json
     """
     data_dir = resources.files("toss_mcp").joinpath("data")
 
-    compressed = data_dir.joinpath("toss_icons.json.gz")
+    compressed = data_dir.joinpath("toss_icons.json.zst")
     if compressed.is_file():
         try:
-            compressed_bytes = compressed.read_bytes()
-            return gzip.decompress(compressed_bytes).decode("utf-8")
+            # 압축 원본 전체를 메모리에 올리지 않고 파일에서 바로 풀어 읽는다
+            with compressed.open("rb") as f:
+                return zstd.ZstdDecompressor().stream_reader(f).read()
         except Exception as exc:
             logger.error("압축 아이콘 카탈로그 로드 실패: %s", exc)
 
     plain = data_dir.joinpath("toss_icons.json")
     if plain.is_file():
         try:
-            return plain.read_text("utf-8")
+            return plain.read_bytes()
         except Exception as exc:
             logger.error("일반 아이콘 카탈로그 로드 실패: %s", exc)
 
     logger.error(
         "아이콘 카탈로그 파일을 찾을 수 없습니다: "
-        "toss_mcp/data/toss_icons.json(.gz)"
+        "toss_mcp/data/toss_icons.json(.zst)"
     )
     return None
 
 
 def load_icon_items() -> list[dict]:
     """패키지 내 toss_icons.json에서 아이콘 목록을 로드한다."""
-    raw = _load_icon_payload_text()
+    raw = _load_icon_payload_bytes()
     if raw is None:
         return []
 
     try:
-        payload = json.loads(raw)
-    except json.JSONDecodeError as exc:
+        payload = orjson.loads(raw)
+    except orjson.JSONDecodeError as exc:
         logger.error("아이콘 카탈로그 JSON 파싱 실패: %s", exc)
         return []
 
@@ -90,9 +96,28 @@ def load_icon_items() -> list[dict]:
     if not isinstance(items, list):
         logger.error("아이콘 카탈로그 형식 오류: 'items' 필드가 list가 아닙니다")
         return []
+
+    # 검색용 소문자 텍스트/타입은 로드 시 한 번만 만든다
+    for item in items:
+        item["_search_blob"] = (
+            f"{item.get('name', '')} {item.get('type', '')} {item.get('src', '')}"
+        ).lower()
+        item["_type_lc"] = str(item.get("type", "")).lower()
     return items
 
 
+def build_icon_index(items: list[dict]) -> dict:
+    """아이콘 목록으로 검색 인덱스를 만든다.
+
+    `searcher.build_text_index` 결과에 원본 아이콘(items)과
+    정렬용 이름(names)을 더해 반환한다.
+    """
+    index = build_text_index([item["_search_blob"] for item in items])
+    index["items"] = items
+    index["names"] = [str(item.get("name", "")) for item in items]
+    return index
+
+
 def _infer_usage_family(name: str, icon_type: str, src: str) -> str:
     """아이콘 이름/타입 기반으로 권장 사용 패밀리를 판별한다."""
     lower_name = name.lower()
@@ -136,48 +161,60 @@ def get_item_usage_hint(item: dict) -> str:
 
 
 def search_icon_catalog(
-    items: list[dict],
+    index: dict,
     query: str,
     icon_type: str | None = None,
     max_results: int = MAX_ICON_RESULTS,
 ) -> list[dict]:
-    """아이콘 카탈로그를 키워드로 검색한다."""
-    keywords = [kw for kw in query.lower().split() if kw]
+    """아이콘 카탈로그를 키워드로 검색한다.
+
+    index는 `build_icon_index`로 만든 역색인이다.
+    """
+    keywords = split_keywords(query)
     if not keywords:
         return []
 
-    normalized_type = icon_type.lower() if icon_type else None
-    exact_matches: list[dict] = []
-    partial_matches: list[dict] = []
+    items = index["items"]
+    names = index["names"]
 
-    for item in items:
-        name = str(item.get("name", ""))
-        item_type = str(item.get("type", ""))
-        src = str(item.get("src", ""))
-
-        if normalized_type and item_type.lower() != normalized_type:
-            continue
-
-        searchable = f"{name} {item_type} {src}".lower()
-        matched_keywords = [kw for kw in keywords if kw in searchable]
-        match_count = len(matched_keywords)
-        if match_count == 0:
-            continue
-
-        entry = {
-            "name": name,
-            "type": item_type,
-            "src": src,
-            "match_count": match_count,
-            "match_ratio": match_count / len(keywords),
-        }
-
-        if match_count == len(keywords):
-            exact_matches.append(entry)
-        else:
-            partial_matches.append(entry)
-
-    sort_key = lambda x: (-x["match_count"], x["name"])
-    exact_matches.sort(key=sort_key)
-    partial_matches.sort(key=sort_key)
-    return (exact_matches + partial_matches)[:max_results]
+    counts: Counter[int] = Counter()
+    hits: dict[str, set[int]] = {}
+    for kw in keywords:
+        if kw not in hits:
+            hits[kw] = lookup_keyword(index, kw)
+        counts.update(hits[kw])
+
+    normalized_type = icon_type.lower() if icon_type else None
+    if normalized_type:
+        counts = Counter(
+            {i: c for i, c in counts.items() if items[i]["_type_lc"] == normalized_type}
+        )
+
+    # 정확 매칭만으로 max_results를 채우면 부분 매칭은 순위를 매기지 않는다
+    sort_key = lambda i: (-counts[i], names[i], i)
+    exact_ids = heapq.nsmallest(
+        max_results,
+        (i for i, c in counts.items() if c == len(keywords)),
+        key=sort_key,
+    )
+    partial_ids = []
+    if len(exact_ids) < max_results:
+        partial_ids = heapq.nsmallest(
+            max_results - len(exact_ids),
+            (i for i, c in counts.items() if c != len(keywords)),
+            key=sort_key,
+        )
+
+    results = []
+    for i in exact_ids + partial_ids:
+        item = items[i]
+        results.append(
+            {
+                "name": names[i],
+                "type": str(item.get("type", "")),
+                "src": str(item.get("src", "")),
+                "match_count": counts[i],
+                "match_ratio": counts[i] / len(keywords),
+            }
+        )
+    return results
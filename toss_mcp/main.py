@@ -1,30 +1,31 @@
 """토스 API 문서 검색 MCP 서버"""
 
+import asyncio
+import io
 import logging
 from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP
 
 from .collector import (
-    collect_all,
-    fetch_single_source_raw,
+    collect_and_chunk,
     check_source_etags,
     collect_etags,
-    SOURCES,
+    close_client,
 )
-from .chunker import chunk_all
-from .searcher import search
+from .searcher import ChunkStore, build_index, clear_search_cache, search
 from .icons import (
     SUPPORTED_ICON_TYPES,
     ICON_USAGE_GUIDE,
     load_icon_items,
+    build_icon_index,
     search_icon_catalog,
     get_item_usage_hint,
 )
 from .cache import (
     load_chunks,
     save_chunks,
-    update_hashes,
+    save_hashes,
     load_etags,
     save_etags,
 )
@@ -35,19 +36,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 검색 결과 출력 템플릿 (format_map으로 채운다)
+_DOC_RESULT_TEMPLATE = (
+    "### 결과 {i} [{source}]\n"
+    "**헤더**: {header}\n"
+    "**URL**: {url}\n"
+    "**매칭**: {match_count}개 키워드 ({match_ratio:.0%})\n\n"
+    "{content}\n"
+)
+_ICON_RESULT_TEMPLATE = (
+    "### 결과 {i}\n"
+    "- **이름**: `{name}`\n"
+    "- **타입**: `{type}`\n"
+    "- **소스(URL)**: {src}\n"
+    "- **매칭**: {match_count}개 키워드 ({match_ratio:.0%})\n"
+    "- **권장 사용**: {hint}\n"
+)
+
 # 전역 청크 저장소
-_chunks: list[dict] = []
+_chunk_store: ChunkStore | None = None
 _icon_items: list[dict] = []
+_icon_index: dict = {}
+
+
+async def _set_chunks(chunks: list[dict]):
+    """검색 인덱스를 만든 뒤 전역 청크 저장소를 교체한다."""
+    global _chunk_store
+    _chunk_store = await asyncio.to_thread(build_index, chunks)
+    # 교체 뒤 이벤트 루프에서 비워야 재빌드 중 이전 저장소로 캐시된 결과가 남지 않는다
+    clear_search_cache()
 
 
 async def _init_chunks():
     """캐시 또는 수집으로 청크를 초기화한다."""
-    global _chunks
-
-    cached = load_chunks()
+    cached = await load_chunks()
 
     if cached:
-        stored_etags = load_etags()
+        stored_etags = await load_etags()
 
         if stored_etags:
             # 캐시 + ETag 존재 → ETag 비교로 변경 감지
@@ -55,47 +80,46 @@ async def _init_chunks():
             new_etags, needs_refresh = await check_source_etags(stored_etags)
 
             if not needs_refresh:
-                _chunks = cached
-                logger.info("ETag 변경 없음, 캐시 사용: %d개 청크", len(_chunks))
+                await _set_chunks(cached)
+                logger.info("ETag 변경 없음, 캐시 사용: %d개 청크", len(cached))
                 return
 
             # 변경 감지 → 전체 재수집
             logger.info("ETag 변경 감지, 문서 재수집 시작...")
-            collected = await collect_all()
-            _chunks = chunk_all(collected)
-            save_chunks(_chunks)
-            raw_texts = {k: v["raw_text"] for k, v in collected.items()}
-            update_hashes(raw_texts)
-            save_etags(new_etags)
-            logger.info("재수집 완료: %d개 청크", len(_chunks))
+            chunks, raw_hashes = await collect_and_chunk()
+            await save_chunks(chunks)
+            await _set_chunks(chunks)
+            await save_hashes(raw_hashes)
+            await save_etags(new_etags)
+            logger.info("재수집 완료: %d개 청크", len(chunks))
             return
 
         # 캐시 있지만 ETag 없음 (이전 포맷) → 캐시 사용 + ETag 저장
-        _chunks = cached
-        logger.info("캐시에서 %d개 청크 로드 (ETag 없음, 다음 기동용 수집)", len(_chunks))
+        await _set_chunks(cached)
+        logger.info("캐시에서 %d개 청크 로드 (ETag 없음, 다음 기동용 수집)", len(cached))
         etags = await collect_etags()
         if etags:
-            save_etags(etags)
+            await save_etags(etags)
         return
 
     # 캐시 없음 → 전체 수집 + 청킹
     logger.info("캐시 없음, 문서 수집 시작...")
-    collected = await collect_all()
-    _chunks = chunk_all(collected)
+    chunks, raw_hashes = await collect_and_chunk()
 
-    save_chunks(_chunks)
-    raw_texts = {k: v["raw_text"] for k, v in collected.items()}
-    update_hashes(raw_texts)
+    await save_chunks(chunks)
+    await _set_chunks(chunks)
+    await save_hashes(raw_hashes)
     etags = await collect_etags()
     if etags:
-        save_etags(etags)
-    logger.info("초기화 완료: %d개 청크", len(_chunks))
+        await save_etags(etags)
+    logger.info("초기화 완료: %d개 청크", len(chunks))
 
 
 def _init_icons():
     """아이콘 카탈로그를 로드한다."""
-    global _icon_items
+    global _icon_items, _icon_index
     _icon_items = load_icon_items()
+    _icon_index = build_icon_index(_icon_items)
     if _icon_items:
         logger.info("아이콘 카탈로그 로드 완료: %d개", len(_icon_items))
     else:
@@ -104,10 +128,13 @@ def _init_icons():
 
 @asynccontextmanager
 async def lifespan(server: FastMCP):
-    """서버 시작 시 문서를 로드한다."""
-    await _init_chunks()
-    _init_icons()
-    yield
+    """서버 시작 시 문서를 로드하고, 종료 시 HTTP 클라이언트를 닫는다."""
+    try:
+        await _init_chunks()
+        _init_icons()
+        yield
+    finally:
+        await close_client()
 
 
 mcp = FastMCP(
@@ -125,24 +152,19 @@ async def search_docs(query: str, source: str | None = None) -> str:
         query: 검색어 (공백으로 구분된 키워드)
         source: 소스 필터 (선택). "apps_in_toss", "tds_react_native", "tds_mobile"
     """
-    if not _chunks:
+    if not _chunk_store:
         return "문서가 아직 로드되지 않았습니다. sync_sources를 호출해 주세요."
 
-    results = search(_chunks, query, source=source)
+    results = search(_chunk_store, query, source=source)
     if not results:
         return f"'{query}'에 대한 검색 결과가 없습니다."
 
-    output_parts = []
+    buf = io.StringIO()
     for i, r in enumerate(results, 1):
-        output_parts.append(
-            f"### 결과 {i} [{r['source']}]\n"
-            f"**헤더**: {r['header']}\n"
-            f"**URL**: {r['url']}\n"
-            f"**매칭**: {r['match_count']}개 키워드 ({r['match_ratio']:.0%})\n\n"
-            f"{r['content']}\n"
-        )
-
-    return "\n---\n".join(output_parts)
+        if i > 1:
+            buf.write("\n---\n")
+        buf.write(_DOC_RESULT_TEMPLATE.format_map(r | {"i": i}))
+    return buf.getvalue()
 
 
 @mcp.tool()
@@ -152,29 +174,22 @@ async def sync_sources(force: bool = False) -> str:
     Args:
         force: True이면 캐시를 무시하고 강제 재수집
     """
-    global _chunks
-
     if force:
         logger.info("강제 동기화 시작")
-        collected = await collect_all()
-        _chunks = chunk_all(collected)
-
-        raw_texts = {}
-        for key, source in SOURCES.items():
-            text = await fetch_single_source_raw(source["llms_url"])
-            if text:
-                raw_texts[key] = text
-
-        save_chunks(_chunks)
-        if raw_texts:
-            update_hashes(raw_texts)
+        # 수집 중 계산한 원본 해시를 그대로 사용 (원본 재다운로드 불필요)
+        chunks, raw_hashes = await collect_and_chunk()
+
+        await save_chunks(chunks)
+        await _set_chunks(chunks)
+        if raw_hashes:
+            await save_hashes(raw_hashes)
         etags = await collect_etags()
         if etags:
-            save_etags(etags)
-        return f"강제 동기화 완료: {len(_chunks)}개 청크"
+            await save_etags(etags)
+        return f"강제 동기화 완료: {len(chunks)}개 청크"
     else:
         await _init_chunks()
-        return f"동기화 완료: {len(_chunks)}개 청크"
+        return f"동기화 완료: {len(_chunk_store)}개 청크"
 
 
 @mcp.tool()
@@ -210,7 +225,7 @@ async def search_icons(
     max_results = min(max_results, 30)
 
     results = search_icon_catalog(
-        _icon_items,
+        _icon_index,
         query=query,
         icon_type=normalized_icon_type,
         max_results=max_results,
@@ -219,23 +234,19 @@ async def search_icons(
         filter_text = f", type={icon_type}" if icon_type else ""
         return f"'{query}'{filter_text} 조건에 대한 아이콘 검색 결과가 없습니다."
 
-    output_parts = []
+    buf = io.StringIO()
+    buf.write(f"'{query}' 아이콘 검색 결과 {len(results)}개\n\n")
     for i, item in enumerate(results, 1):
-        output_parts.append(
-            f"### 결과 {i}\n"
-            f"- **이름**: `{item['name']}`\n"
-            f"- **타입**: `{item['type']}`\n"
-            f"- **소스(URL)**: {item['src']}\n"
-            f"- **매칭**: {item['match_count']}개 키워드 ({item['match_ratio']:.0%})\n"
-            f"- **권장 사용**: {get_item_usage_hint(item)}\n"
+        if i > 1:
+            buf.write("\n")
+        buf.write(
+            _ICON_RESULT_TEMPLATE.format_map(
+                item | {"i": i, "hint": get_item_usage_hint(item)}
+            )
         )
-
-    return (
-        f"'{query}' 아이콘 검색 결과 {len(results)}개\n\n"
-        + "\n".join(output_parts)
-        + "\n"
-        + ICON_USAGE_GUIDE
-    )
+    buf.write("\n")
+    buf.write(ICON_USAGE_GUIDE)
+    return buf.getvalue()
 
 
 def main():
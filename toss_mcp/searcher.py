@@ -1,14 +1,148 @@
 """키워드 기반 문서 검색"""
 
+import re
+import sys
+import heapq
 import logging
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 MAX_RESULTS = 10
+SEARCH_CACHE_SIZE = 256
+
+# 인덱스 토큰 단위: 단어 문자 + 하이픈 (예: "icon-search", "결제를")
+TOKEN_PATTERN = re.compile(r"[\w\-]+")
+
+
+def build_text_index(texts: list[str]) -> dict:
+    """소문자 텍스트 목록으로 역색인을 만든다.
+
+    반환: {texts, postings, vocab, vocab_blob, vocab_offsets}
+    - postings: 토큰 → 해당 토큰이 등장하는 텍스트 번호 집합
+    - vocab_blob / vocab_offsets: 정렬된 토큰을 줄바꿈으로 이은 문자열과
+      각 토큰의 시작 위치 (키워드 부분 문자열 → 토큰 역추적용)
+    """
+    postings: dict[str, set[int]] = {}
+    for i, text in enumerate(texts):
+        for token in set(TOKEN_PATTERN.findall(text)):
+            ids = postings.get(token)
+            if ids is None:
+                postings[token] = {i}
+            else:
+                ids.add(i)
+
+    vocab = sorted(postings)
+    vocab_offsets = []
+    pos = 0
+    for token in vocab:
+        vocab_offsets.append(pos)
+        pos += len(token) + 1
+
+    return {
+        "texts": texts,
+        "postings": postings,
+        "vocab": vocab,
+        "vocab_blob": "\n".join(vocab),
+        "vocab_offsets": vocab_offsets,
+    }
+
+
+@dataclass(eq=False)
+class ChunkStore:
+    """검색용 청크 저장소.
+
+    청크 dict 리스트 대신 필드별 열(column) 리스트로 보관해 검색 중
+    dict 조회를 없애고, source 필터는 미리 만든 청크 번호 집합으로 처리한다.
+    """
+
+    sources: list[str]
+    urls: list[str]
+    headers: list[str]
+    contents: list[str]
+    text_index: dict  # build_text_index 결과 (소문자 header + content)
+    source_ids: dict[str, set[int]]
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+
+def build_index(chunks: list[dict]) -> ChunkStore:
+    """청크 리스트로 검색 저장소(열 단위 배치 + 역색인)를 만든다."""
+    sources = [c["source"] for c in chunks]
+    headers = [c["header"] for c in chunks]
+    contents = [c["content"] for c in chunks]
+    text_index = build_text_index(
+        [(h + " " + c).lower() for h, c in zip(headers, contents)]
+    )
+
+    source_ids: dict[str, set[int]] = {}
+    for i, source in enumerate(sources):
+        source_ids.setdefault(source, set()).add(i)
+
+    logger.info(
+        "검색 인덱스 생성: %d개 청크, %d개 토큰",
+        len(chunks),
+        len(text_index["vocab"]),
+    )
+    return ChunkStore(
+        sources=sources,
+        urls=[c["url"] for c in chunks],
+        headers=headers,
+        contents=contents,
+        text_index=text_index,
+        source_ids=source_ids,
+    )
+
+
+def lookup_keyword(index: dict, keyword: str) -> set[int]:
+    """키워드를 부분 문자열로 포함하는 텍스트 번호 집합을 반환한다."""
+    if not TOKEN_PATTERN.fullmatch(keyword):
+        # 구두점 등이 섞인 키워드는 토큰 경계를 넘을 수 있어 본문을 직접 확인한다.
+        # 키워드 안의 단어 조각("a.b" → "a", "b")도 본문에 반드시 있으므로
+        # 조각별 매칭 집합의 교집합으로 후보를 먼저 좁힌다.
+        texts = index["texts"]
+        candidates = None
+        for piece in TOKEN_PATTERN.findall(keyword):
+            ids = lookup_keyword(index, piece)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        if candidates is None:
+            candidates = range(len(texts))
+        return {i for i in candidates if keyword in texts[i]}
+
+    # 단어 문자로만 된 키워드는 반드시 한 토큰 안에 들어 있으므로
+    # 어휘 목록에서 키워드를 포함하는 토큰을 찾아 posting을 합친다.
+    vocab = index["vocab"]
+    postings = index["postings"]
+    blob = index["vocab_blob"]
+    offsets = index["vocab_offsets"]
+
+    ids: set[int] = set()
+    pos = blob.find(keyword)
+    while pos != -1:
+        t = bisect_right(offsets, pos) - 1
+        ids |= postings[vocab[t]]
+        if t + 1 >= len(offsets):
+            break
+        pos = blob.find(keyword, offsets[t + 1])
+    return ids
+
+
+def split_keywords(query: str) -> tuple[str, ...]:
+    """검색어를 소문자 키워드 튜플로 나눈다.
+
+    키워드는 sys.intern으로 고정해 posting/캐시 dict 조회가 포인터 비교로 끝나게 한다.
+    """
+    return tuple(sys.intern(kw) for kw in query.lower().split())
 
 
 def search(
-    chunks: list[dict],
+    store: ChunkStore,
     query: str,
     source: str | None = None,
     max_results: int = MAX_RESULTS,
@@ -18,44 +152,67 @@ def search(
     - 모든 키워드 포함 → 정확 매칭 (우선순위 높음)
     - 일부 키워드 포함 → 부분 매칭 (폴백)
     - source 필터 지원: "apps_in_toss", "tds_react_native", "tds_mobile"
+
+    같은 저장소에 대한 같은 (키워드, source, max_results) 요청은 LRU 캐시로
+    바로 반환한다. 반환 항목은 캐시와 공유되므로 수정하지 않는다.
     """
-    keywords = query.lower().split()
+    keywords = split_keywords(query)
     if not keywords:
         return []
+    return list(_search_cached(store, keywords, source, max_results))
+
+
+def clear_search_cache():
+    """검색 결과 LRU 캐시를 비운다.
+
+    저장소를 교체한 직후 호출해 이전 저장소를 참조하는 결과(와 저장소 자체)를 놓아 준다.
+    """
+    _search_cached.cache_clear()
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _search_cached(
+    store: ChunkStore,
+    keywords: tuple[str, ...],
+    source: str | None,
+    max_results: int,
+) -> tuple[dict, ...]:
+    """`search`의 실제 검색 로직 (LRU 캐시 대상)."""
+    # source 필터는 키워드별 매칭 집합과의 교집합으로 적용
+    allowed = store.source_ids.get(source, set()) if source else None
+
+    # 청크별 매칭 키워드 수 (중복 키워드는 원래대로 중복 집계)
+    counts: Counter[int] = Counter()
+    hits: dict[str, set[int]] = {}
+    for kw in keywords:
+        if kw not in hits:
+            ids = lookup_keyword(store.text_index, kw)
+            hits[kw] = ids & allowed if allowed is not None else ids
+        counts.update(hits[kw])
+
+    # 정확 매칭 우선(청크 순서), 부분 매칭은 매칭 수 내림차순.
+    # 정확 매칭만으로 max_results를 채우면 부분 매칭은 순위를 매기지 않는다.
+    exact_ids = heapq.nsmallest(
+        max_results, (i for i, c in counts.items() if c == len(keywords))
+    )
+    partial_ids = []
+    if len(exact_ids) < max_results:
+        partial_ids = heapq.nsmallest(
+            max_results - len(exact_ids),
+            (i for i, c in counts.items() if c != len(keywords)),
+            key=lambda i: (-counts[i], i),
+        )
 
-    # source 필터 적용
-    candidates = chunks
-    if source:
-        candidates = [c for c in candidates if c["source"] == source]
-
-    exact_matches = []
-    partial_matches = []
-
-    for chunk in candidates:
-        searchable = (chunk["header"] + " " + chunk["content"]).lower()
-        matched = [kw for kw in keywords if kw in searchable]
-        match_count = len(matched)
-
-        if match_count == 0:
-            continue
-
-        entry = {
-            "source": chunk["source"],
-            "url": chunk["url"],
-            "header": chunk["header"],
-            "content": chunk["content"],
-            "match_count": match_count,
-            "match_ratio": match_count / len(keywords),
-        }
-
-        if match_count == len(keywords):
-            exact_matches.append(entry)
-        else:
-            partial_matches.append(entry)
-
-    # 정확 매칭 우선, 부분 매칭은 매칭 수 내림차순
-    exact_matches.sort(key=lambda x: -x["match_count"])
-    partial_matches.sort(key=lambda x: -x["match_count"])
-
-    results = exact_matches + partial_matches
-    return results[:max_results]
+    results = []
+    for i in exact_ids + partial_ids:
+        results.append(
+            {
+                "source": store.sources[i],
+                "url": store.urls[i],
+                "header": store.headers[i],
+                "content": store.contents[i],
+                "match_count": counts[i],
+                "match_ratio": counts[i] / len(keywords),
+            }
+        )
+    return tuple(results)